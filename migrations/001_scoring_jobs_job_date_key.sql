@@ -0,0 +1,19 @@
+-- One-time migration: keep a single scoring_jobs record per job_date.
+--
+-- ScoringJob.create_job_record upserts on job_date, which needs a unique index.
+-- Runs before this change could leave several records for the same date, so the
+-- older duplicates (lower id) are removed first. Back up scoring_jobs before
+-- applying if that history matters:
+--
+--   psql "$DB_URL" -f migrations/001_scoring_jobs_job_date_key.sql
+
+BEGIN;
+
+DELETE FROM scoring_jobs a
+USING scoring_jobs b
+WHERE a.job_date = b.job_date
+AND a.id < b.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS scoring_jobs_job_date_key ON scoring_jobs (job_date);
+
+COMMIT;
@@ -0,0 +1,213 @@
+import json
+import math
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+import redis
+
+import job
+
+
+def employee_count_matches(company_length, employee_min, employee_max):
+    """Original employee count rule, as applied to one company name length"""
+    estimated_employees = max(1, company_length * 10)
+    return employee_min <= estimated_employees <= employee_max
+
+
+def default_config(**overrides):
+    config = {
+        'audit_score_weight': 0.4,
+        'audit_score_threshold': 50,
+        'audit_score_points': 10,
+        'employee_count_min': 1,
+        'employee_count_max': 250,
+        'employee_count_points': 5,
+        'email_exists_points': 2,
+        'website_ssl_points': 3,
+        'company_size_bonus': 8,
+    }
+    config.update(overrides)
+    return config
+
+
+BOUNDS = [-5, 0, 0.5, 1, 1.5, 2, 9, 9.9, 10, 10.5, 11, 19, 20, 25, 99.5, 100, 250, 251]
+
+
+@pytest.mark.parametrize('employee_min', BOUNDS)
+@pytest.mark.parametrize('employee_max', BOUNDS)
+def test_company_length_window_matches_employee_estimate(employee_min, employee_max):
+    params = job.build_score_params(
+        default_config(employee_count_min=employee_min, employee_count_max=employee_max)
+    )
+
+    for company_length in range(0, 60):
+        in_window = params['company_length_min'] <= company_length <= params['company_length_max']
+        assert in_window == employee_count_matches(company_length, employee_min, employee_max), company_length
+
+
+def test_build_score_params_binds_whole_numbers_as_ints():
+    params = job.build_score_params(default_config(audit_score_points=10.0, website_ssl_points=2.5))
+
+    assert params['audit_score_points'] == 10
+    assert isinstance(params['audit_score_points'], int)
+    assert params['website_ssl_points'] == 2.5
+    assert params['audit_score'] == 0
+
+
+@pytest.mark.parametrize('value', ['inf', '-inf', 'nan', 'Infinity', float('inf')])
+def test_parse_config_value_rejects_non_finite(value):
+    with pytest.raises(ValueError):
+        job.parse_config_value(value)
+
+
+def test_parse_config_value_accepts_numbers():
+    assert job.parse_config_value('12.5') == 12.5
+    assert job.parse_config_value(3) == 3.0
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class FakeConnection:
+    def __init__(self, rows=(), dbname='leadflowx'):
+        self.rows = list(rows)
+        self.info = SimpleNamespace(host='postgres', port=5432, dbname=dbname)
+        self.cursors_opened = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    @contextmanager
+    def cursor(self, cursor_factory=None):
+        self.cursors_opened += 1
+        yield FakeCursor(self.rows)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeCache:
+    def __init__(self, values=None, fail_setex=False):
+        self.values = dict(values or {})
+        self.fail_setex = fail_setex
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def setex(self, key, ttl, value):
+        if self.fail_setex:
+            raise redis.ConnectionError('Redis is down')
+        self.values[key] = value
+
+
+def make_job(monkeypatch, conn, cache=None):
+    monkeypatch.delenv('REDIS_URL', raising=False)
+    scoring_job = job.ScoringJob()
+    scoring_job.conn = conn
+    scoring_job.cache = cache
+    return scoring_job
+
+
+def test_get_scoring_config_skips_non_finite_values(monkeypatch):
+    # The query only returns keys matching 'scoring_%'. Those are stored under
+    # their own names and don't line up with the default_config keys, so they
+    # don't override the defaults; this only pins the non-finite handling.
+    scoring_job = make_job(monkeypatch, FakeConnection([
+        {'key': 'scoring_employee_count_max', 'value': 'inf'},
+        {'key': 'scoring_employee_count_min', 'value': 'nan'},
+        {'key': 'scoring_email_exists_points', 'value': '4'},
+    ]))
+
+    config = scoring_job.get_scoring_config()
+
+    assert 'scoring_employee_count_max' not in config
+    assert 'scoring_employee_count_min' not in config
+    assert config['scoring_email_exists_points'] == 4.0
+    assert {key: value for key, value in config.items() if key in default_config()} == default_config()
+    assert all(math.isfinite(value) for value in config.values())
+    job.build_score_params(config)
+
+
+def test_cached_partial_config_is_merged_over_defaults(monkeypatch):
+    conn = FakeConnection()
+    scoring_job = make_job(monkeypatch, conn)
+    scoring_job.cache = FakeCache({scoring_job.scoring_config_cache_key(): json.dumps({'email_exists_points': 7})})
+
+    config = scoring_job.get_scoring_config()
+
+    assert config == default_config(email_exists_points=7.0)
+    assert conn.cursors_opened == 0
+    job.build_score_params(config)
+
+
+@pytest.mark.parametrize('cached', ['[1, 2]', 'null', '"scoring"', '{not json'])
+def test_cached_non_object_falls_back_to_database(monkeypatch, cached):
+    conn = FakeConnection()
+    scoring_job = make_job(monkeypatch, conn)
+    key = scoring_job.scoring_config_cache_key()
+    scoring_job.cache = FakeCache({key: cached})
+
+    config = scoring_job.get_scoring_config()
+
+    assert config == default_config()
+    assert conn.cursors_opened == 1
+    assert json.loads(scoring_job.cache.values[key]) == config
+
+
+def test_cache_write_failure_still_returns_database_config(monkeypatch):
+    conn = FakeConnection()
+    scoring_job = make_job(monkeypatch, conn, FakeCache(fail_setex=True))
+
+    assert scoring_job.get_scoring_config() == default_config()
+    assert conn.cursors_opened == 1
+
+
+def test_cache_key_is_scoped_per_database(monkeypatch):
+    staging = make_job(monkeypatch, FakeConnection(dbname='leadflowx_staging'))
+    production = make_job(monkeypatch, FakeConnection(dbname='leadflowx'))
+    cache = FakeCache({staging.scoring_config_cache_key(): json.dumps({'email_exists_points': 7})})
+    production.cache = cache
+
+    assert staging.scoring_config_cache_key() != production.scoring_config_cache_key()
+    assert production.get_scoring_config()['email_exists_points'] == 2
+
+
+def test_invalid_redis_url_disables_cache(monkeypatch):
+    monkeypatch.setenv('REDIS_URL', 'localhost:6379')
+
+    assert job.ScoringJob().cache is None
+
+
+def test_create_job_record_refuses_a_running_record(monkeypatch):
+    # The upsert's DO UPDATE skips a record another run has claimed, so no row
+    # comes back
+    conn = FakeConnection([])
+    scoring_job = make_job(monkeypatch, conn)
+
+    assert scoring_job.create_job_record() is False
+    assert scoring_job.job_id is None
+    assert conn.commits == 1
+    assert conn.rollbacks == 0
+
+
+def test_create_job_record_claims_todays_record(monkeypatch):
+    conn = FakeConnection([{'id': 42}])
+    scoring_job = make_job(monkeypatch, conn)
+
+    assert scoring_job.create_job_record() is True
+    assert scoring_job.job_id == 42
+    assert conn.commits == 1